@@ -7,75 +7,449 @@ and email addresses, and also export the data to CSV.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import argparse
 import configparser
-import arrow
 import csv
+import gzip
+from html import escape
+import hashlib
+import json
+import string
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from zoneinfo import ZoneInfo
+from typing import IO, List, Dict, Iterable, Iterator, Optional, Tuple
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    from json import loads as json_loads
 
-def load_config(config_path: str = "./config.ini") -> configparser.ConfigParser:
-    """Load configuration from INI file."""
-    config = configparser.ConfigParser()
-    if not config.read(config_path):
+
+# Organizations queried per GraphQL request; keeps each request well under
+# GitHub's node limit while still collapsing many orgs into one round-trip
+BATCH_SIZE = 10
+
+# Batches fetched concurrently; matches the session's connection pool size
+MAX_WORKERS = 4
+
+# Once fewer than this many rate-limit points remain, wait for the reset
+RATE_LIMIT_THRESHOLD = 10
+
+# Attempts per request when GitHub answers with a rate-limit error
+RATE_LIMIT_RETRIES = 5
+
+# Set when the report stops consuming fetched batches (e.g. on Ctrl-C) so
+# worker threads give up instead of finishing their requests and waits
+fetch_cancelled = threading.Event()
+
+# Epoch time the primary rate limit resets, recorded once the remaining budget
+# drops below RATE_LIMIT_THRESHOLD; the next request waits until then
+rate_limit_reset = 0.0
+
+# Column headings of the CSV report
+CSV_HEADER = ('Organization', 'Username', 'Email Address')
+
+# One report row, in CSV_HEADER order. Rows stay plain tuples end to end
+# (API -> CSV -> HTML) so no per-user dict is ever built.
+UserRow = Tuple[str, str, str]
+
+# Fastest gzip level; report text still compresses around 10x
+GZIP_LEVEL = 1
+
+# Per-organization API responses are cached here between runs
+CACHE_DIR = Path("Reports") / ".cache"
+
+# Default cache lifetime in seconds; override with cache_ttl in config.ini
+DEFAULT_CACHE_TTL = 900
+
+# Selection for one aliased organization in a batched query
+ORGANIZATION_FIELDS = '''
+    org{i}: organization(login: $org{i}) {{
+        samlIdentityProvider {{
+            externalIdentities(first: 100, after: $after{i}) {{
+                pageInfo {{
+                    hasNextPage
+                    endCursor
+                }}
+                edges {{
+                    node {{
+                        samlIdentity {{
+                            nameId
+                        }}
+                        user {{
+                            login
+                        }}
+                    }}
+                }}
+            }}
+        }}
+    }}
+'''
+
+
+@dataclass(frozen=True)
+class Config:
+    """Settings read from config.ini."""
+    token: str
+    orgs: List[str]
+    html_header: str
+    cache_ttl: int = DEFAULT_CACHE_TTL
+
+
+def load_config(config_path: str = "./config.ini") -> Config:
+    """
+    Load and validate configuration from INI file.
+    
+    Raises:
+        FileNotFoundError: If the config file does not exist
+        configparser.Error: If a setting is missing or invalid
+    """
+    parser = configparser.ConfigParser()
+    if not parser.read(config_path):
         raise FileNotFoundError(f"Config file not found: {config_path}")
-    return config
+    
+    section = 'configuration'
+    # Drop blanks and duplicates (preserving order) so each org gets a single alias
+    orgs = list(dict.fromkeys(
+        org.strip() for org in parser.get(section, 'github_org').split(',') if org.strip()
+    ))
+    if not orgs:
+        raise configparser.Error("github_org must name at least one organization")
+    
+    try:
+        cache_ttl = parser.getint(section, 'cache_ttl', fallback=DEFAULT_CACHE_TTL)
+    except ValueError:
+        raise configparser.Error("cache_ttl must be a whole number of seconds")
+    
+    return Config(
+        token=parser.get(section, 'github_api_token'),
+        orgs=orgs,
+        html_header=parser.get(section, 'HTML_HEADER'),
+        cache_ttl=cache_ttl,
+    )
 
 
-def get_saml_users(org: str, token: str) -> Dict:
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Report GitHub usernames and their SAML identities.")
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="clear cached API responses and query GitHub for every organization"
+    )
+    parser.add_argument(
+        '--no-compress',
+        action='store_true',
+        help="write a plain .csv report instead of a gzip-compressed one"
+    )
+    return parser.parse_args()
+
+
+def create_session(token: str) -> requests.Session:
     """
-    Query GitHub GraphQL API for SAML users in an organization.
+    Create an authenticated HTTP session for the GitHub GraphQL API.
+    
+    The session keeps its connections to api.github.com alive across requests,
+    asks for compressed responses, and retries transient gateway errors with
+    exponential backoff. Rate limits are handled separately by post_graphql.
     
     Args:
-        org: GitHub organization name
         token: GitHub API token
         
     Returns:
-        Dict containing the API response
+        Configured requests.Session
+    """
+    session = requests.Session()
+    # requests already asks for gzip, plus br when brotli is installed
+    session.headers.update({'Authorization': f'bearer {token}'})
+    
+    # GraphQL queries are read-only, so retrying the POST is safe
+    retry = Retry(
+        total=5,
+        backoff_factor=1,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=['POST'],
+    )
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry))
+    
+    return session
+
+
+def chunked(items: List[str], size: int) -> Iterator[List[str]]:
+    """Yield successive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def build_batched_query(orgs: List[str]) -> str:
+    """
+    Build one GraphQL document that queries several organizations at once.
+    
+    Each organization is selected under its own alias (org0, org1, ...) with
+    its own login and cursor variables, so pages can be fetched independently.
+    
+    Args:
+        orgs: GitHub organization names, in alias order
         
+    Returns:
+        GraphQL query string
+    """
+    params = ', '.join(f'$org{i}: String!, $after{i}: String' for i in range(len(orgs)))
+    fields = ''.join(ORGANIZATION_FIELDS.format(i=i) for i in range(len(orgs)))
+    return f'query({params}) {{{fields}}}'
+
+
+def seconds_until_reset(response: requests.Response) -> float:
+    """Return seconds until the primary rate limit in a response resets."""
+    reset = response.headers.get('X-RateLimit-Reset')
+    if reset is None:
+        return 60.0
+    return max(0.0, int(reset) - time.time())
+
+
+def rate_limit_wait(response: requests.Response, attempt: int) -> Optional[float]:
+    """
+    Return how long to wait before retrying a rate-limited response.
+    
+    Honors Retry-After, then the primary limit reset time, then falls back to
+    exponential backoff from one minute for secondary limits without either.
+    
+    Returns:
+        Seconds to wait, or None if the response was not rate limited
+    """
+    exhausted = response.headers.get('X-RateLimit-Remaining') == '0'
+    
+    if response.status_code == 200:
+        # GraphQL reports an exhausted primary limit as an error in the body
+        if exhausted and b'RATE_LIMITED' in response.content:
+            return seconds_until_reset(response)
+        return None
+    
+    if response.status_code not in (403, 429):
+        return None
+    
+    retry_after = response.headers.get('Retry-After')
+    if retry_after is not None and retry_after.isdigit():
+        return float(retry_after)
+    if exhausted:
+        return seconds_until_reset(response)
+    if response.status_code == 429 or b'rate limit' in response.content.lower():
+        return 60.0 * 2 ** attempt
+    
+    # A plain 403 is a permissions problem, not a rate limit
+    return None
+
+
+class FetchCancelled(Exception):
+    """Raised in a worker thread once fetching has been cancelled."""
+
+
+def pause(seconds: float) -> None:
+    """Sleep for `seconds`, waking early if fetching is cancelled."""
+    if fetch_cancelled.wait(seconds):
+        raise FetchCancelled()
+
+
+def post_graphql(session: requests.Session, payload: Dict) -> requests.Response:
+    """
+    POST a GraphQL request, backing off when GitHub rate limits it.
+    
+    Rate-limited requests are retried after the wait GitHub asks for. When a
+    response shows the rate-limit budget is nearly spent, the reset time is
+    recorded and the next call waits for it, so no time is lost after the
+    final request of a run.
+    
     Raises:
-        requests.RequestException: If API request fails
+        requests.RequestException: If the request fails or is still rate
+            limited after RATE_LIMIT_RETRIES attempts
+        FetchCancelled: If fetching was cancelled
     """
-    query = '''
-    query($org: String!) {
-        organization(login: $org) {
-            samlIdentityProvider {
-                ssoUrl
-                externalIdentities(first: 100) {
-                    edges {
-                        node {
-                            guid
-                            samlIdentity {
-                                nameId
-                            }
-                            user {
-                                login
-                            }
-                        }
-                    }
-                }
-            }
-        }
-    }
-    '''
+    global rate_limit_reset
     
-    headers = {'Authorization': f'bearer {token}'}
-    variables = {'org': org}
+    wait = rate_limit_reset - time.time()
+    if wait > 0:
+        print(f"  API rate limit nearly spent; waiting {wait:.0f}s for it to reset...")
+        pause(wait)
+    
+    for attempt in range(RATE_LIMIT_RETRIES):
+        if fetch_cancelled.is_set():
+            raise FetchCancelled()
+        response = session.post('https://api.github.com/graphql', json=payload, timeout=30)
+        wait = rate_limit_wait(response, attempt)
+        if wait is None or attempt == RATE_LIMIT_RETRIES - 1:
+            break
+        print(f"  Rate limited by GitHub; retrying in {wait:.0f}s...")
+        pause(wait)
     
-    response = requests.post(
-        'https://api.github.com/graphql',
-        headers=headers,
-        json={'query': query, 'variables': variables},
-        timeout=30
-    )
     response.raise_for_status()
     
-    return response.json()
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    if remaining is not None and int(remaining) < RATE_LIMIT_THRESHOLD:
+        rate_limit_reset = time.time() + seconds_until_reset(response)
+    
+    return response
 
 
-def extract_users(api_response: Dict, org: str) -> List[Dict[str, str]]:
+def get_saml_users_batch(session: requests.Session, orgs: List[str]) -> Dict[str, Dict]:
+    """
+    Query GitHub GraphQL API for SAML users in a batch of organizations.
+    
+    All organizations are fetched in a single request per page. Each one
+    follows its own externalIdentities cursor until every page has been
+    fetched, so organizations with more than 100 identities are reported in full.
+    
+    Args:
+        session: Authenticated session from create_session
+        orgs: GitHub organization names
+        
+    Returns:
+        Dict mapping each organization to a single-organization API response
+        containing the edges from every page
+        
+    Raises:
+        requests.RequestException: If API request fails
+    """
+    edges = {org: [] for org in orgs}
+    cursors = {org: None for org in orgs}
+    results = {}
+    
+    while cursors:
+        pending = list(cursors)
+        query = build_batched_query(pending)
+        variables = {}
+        for i, org in enumerate(pending):
+            variables[f'org{i}'] = org
+            variables[f'after{i}'] = cursors[org]
+        
+        response = post_graphql(session, {'query': query, 'variables': variables})
+        page = json_loads(response.content)
+        data = page.get('data') or {}
+        
+        for i, org in enumerate(pending):
+            organization = data.get(f'org{i}')
+            try:
+                identities = organization['samlIdentityProvider']['externalIdentities']
+            except (KeyError, TypeError):
+                # Let extract_users report the unparseable response
+                results[org] = {'data': {'organization': organization}, 'errors': page.get('errors')}
+                del cursors[org]
+                continue
+            
+            edges[org].extend(identities['edges'])
+            
+            page_info = identities['pageInfo']
+            if page_info['hasNextPage']:
+                cursors[org] = page_info['endCursor']
+            else:
+                identities['edges'] = edges[org]
+                results[org] = {'data': {'organization': organization}}
+                del cursors[org]
+    
+    return results
+
+
+def cache_path(org: str) -> Path:
+    """Return the cache file for an organization."""
+    key = hashlib.sha256(org.lower().encode('utf-8')).hexdigest()[:16]
+    return CACHE_DIR / f"{key}.json"
+
+
+def load_cached_response(org: str, ttl: int) -> Optional[Dict]:
+    """Return the cached API response for an organization, or None if missing or stale."""
+    path = cache_path(org)
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        return json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_response(org: str, response: Dict) -> None:
+    """Cache a successful API response for an organization."""
+    # Failed lookups carry an 'errors' key; always retry those
+    if 'errors' in response:
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(cache_path(org), 'w', encoding='utf-8') as f:
+        json.dump(response, f)
+
+
+def clear_cache() -> None:
+    """Remove all cached API responses."""
+    for path in CACHE_DIR.glob('*.json'):
+        path.unlink()
+
+
+def iter_org_responses(session: requests.Session, organizations: List[str],
+                       cache_ttl: int) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield (organization, API response) pairs in config order.
+    
+    Fresh cached responses are used as-is; the remaining organizations are
+    fetched in batches, concurrently, and cached for the next run. Batches
+    that fail are reported and skipped. If the caller stops early (including
+    on Ctrl-C), queued batches are cancelled and running ones abandon their
+    remaining requests.
+    
+    Args:
+        session: Authenticated session from create_session
+        organizations: GitHub organization names
+        cache_ttl: Maximum age in seconds of a usable cached response
+    """
+    batches = list(chunked(organizations, BATCH_SIZE))
+    
+    fetch_cancelled.clear()
+    executor = ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(batches)))
+    try:
+        jobs = []
+        for batch in batches:
+            cached = {}
+            for org in batch:
+                response = load_cached_response(org, cache_ttl)
+                if response is not None:
+                    cached[org] = response
+            
+            uncached = [org for org in batch if org not in cached]
+            future = executor.submit(get_saml_users_batch, session, uncached) if uncached else None
+            jobs.append((batch, cached, future))
+        
+        for batch, responses, future in jobs:
+            print(f"Fetching users from {', '.join(batch)}...")
+            if future is not None:
+                try:
+                    fetched = future.result()
+                except requests.RequestException as e:
+                    print(f"  Error fetching data: {e}")
+                    fetched = {}
+                except Exception as e:
+                    print(f"  Unexpected error: {e}")
+                    fetched = {}
+                
+                for org, response in fetched.items():
+                    save_cached_response(org, response)
+                responses.update(fetched)
+            
+            for org in batch:
+                if org in responses:
+                    yield org, responses[org]
+    finally:
+        # Every batch is done unless the caller stopped early; don't wait for
+        # the rest in that case
+        fetch_cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_users(api_response: Dict, org: str) -> Iterator[UserRow]:
     """
     Extract user information from API response.
     
@@ -83,146 +457,236 @@ def extract_users(api_response: Dict, org: str) -> List[Dict[str, str]]:
         api_response: GitHub API response
         org: Organization name
         
-    Returns:
-        List of user dictionaries
+    Yields:
+        (organization, username, email) tuples
     """
-    users = []
-    
     try:
         edges = api_response['data']['organization']['samlIdentityProvider']['externalIdentities']['edges']
         
         for edge in edges:
             node = edge['node']
-            users.append({
-                'org': org,
-                'username': node['user']['login'],
-                'email': node['samlIdentity']['nameId']
-            })
+            yield org, node['user']['login'], node['samlIdentity']['nameId']
     except (KeyError, TypeError) as e:
         print(f"Warning: Could not parse users for {org}. Error: {e}")
+
+
+def iter_report_rows(session: requests.Session, organizations: List[str],
+                     cache_ttl: int) -> Iterator[UserRow]:
+    """Yield report rows for every organization as each one is fetched."""
+    for org, response in iter_org_responses(session, organizations, cache_ttl):
+        count = 0
+        for row in iter_users(response, org):
+            yield row
+            count += 1
+        print(f"  Found {count} users in {org}")
+
+
+def open_report(filename: str, mode: str, compressed: Optional[bool] = None) -> IO[str]:
+    """
+    Open a report file in text mode.
     
-    return users
+    The file is gzip-compressed when `compressed` is true, or by default when
+    the filename ends in .gz.
+    """
+    if compressed is None:
+        compressed = filename.endswith('.gz')
+    if compressed:
+        return gzip.open(filename, mode + 't', newline='', encoding='utf-8', compresslevel=GZIP_LEVEL)
+    return open(filename, mode, newline='', encoding='utf-8')
 
 
-def write_csv(users: List[Dict[str, str]], filename: str) -> None:
-    """Write user data to CSV file."""
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['Organization', 'Username', 'Email Address']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        
-        writer.writeheader()
-        for user in users:
-            writer.writerow({
-                'Organization': user['org'],
-                'Username': user['username'],
-                'Email Address': user['email']
-            })
+def write_csv(rows: Iterable[UserRow], filename: str) -> int:
+    """
+    Stream user rows to a CSV file.
+    
+    Rows are written as they are produced, so nothing is buffered in memory.
+    They go to a .partial file that only replaces `filename` once every row
+    has been written, so an interrupted run never leaves a truncated report.
+    
+    Returns:
+        Number of users written
+    """
+    count = 0
     
-    print(f"✓ CSV file created: {filename} ({len(users)} users)")
+    def counted() -> Iterator[UserRow]:
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+    
+    partial = Path(f"{filename}.partial")
+    try:
+        with open_report(str(partial), 'w', compressed=filename.endswith('.gz')) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(counted())
+        partial.replace(filename)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    
+    return count
+
+
+# Stylesheet and sort script shared by every HTML report. They are written
+# once to Reports/assets/ under content-hashed names, so browsers can cache
+# them across reports and a changed asset never overwrites an older one.
+REPORT_CSS = '''@charset "UTF-8";
+* {
+    box-sizing: border-box;
+}
+body {
+    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Arial, sans-serif;
+    margin: 20px;
+    background-color: #f5f5f5;
+}
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+    background-color: white;
+    padding: 30px;
+    border-radius: 8px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+h2 {
+    color: #333;
+    margin-bottom: 10px;
+}
+.stats {
+    color: #666;
+    margin-bottom: 20px;
+    font-size: 14px;
+}
+table {
+    border-collapse: collapse;
+    width: 100%;
+}
+th {
+    background-color: #90EE90;
+    padding: 12px;
+    text-align: left;
+    cursor: pointer;
+    user-select: none;
+    font-weight: 600;
+    position: relative;
+}
+th:hover {
+    background-color: #7CCD7C;
+}
+th::after {
+    content: ' ⇅';
+    font-size: 0.8em;
+    color: #666;
+    opacity: 0.5;
+}
+th.sorted-asc::after {
+    content: ' ▲';
+    opacity: 1;
+}
+th.sorted-desc::after {
+    content: ' ▼';
+    opacity: 1;
+}
+td {
+    background-color: #f9f9f9;
+    padding: 10px 12px;
+    border-bottom: 1px solid #e0e0e0;
+}
+tr:hover td {
+    background-color: #f0f0f0;
+}
+tr:nth-child(even) td {
+    background-color: #fafafa;
+}
+tr:nth-child(even):hover td {
+    background-color: #f0f0f0;
+}
+.footer {
+    margin-top: 30px;
+    padding-top: 20px;
+    border-top: 1px solid #e0e0e0;
+    color: #666;
+    font-size: 14px;
+}
+@media (max-width: 768px) {
+    body {
+        margin: 10px;
+    }
+    .container {
+        padding: 15px;
+    }
+    table {
+        font-size: 14px;
+    }
+}
+'''
+
+REPORT_JS = '''// Created once and reused; localeCompare builds a new collator per call
+const collator = new Intl.Collator('en', { sensitivity: 'base', numeric: true });
+let currentSort = { column: -1, direction: 'asc' };
+
+function sortTable(columnIndex) {
+    const table = document.getElementById("userTable");
+    const tbody = table.querySelector("tbody");
+    const rows = Array.from(tbody.querySelectorAll("tr"));
+    const headers = table.querySelectorAll("th");
+
+    // Determine sort direction
+    let direction = 'asc';
+    if (currentSort.column === columnIndex && currentSort.direction === 'asc') {
+        direction = 'desc';
+    }
 
+    // Read each sort key once, then sort the keyed rows
+    const keyed = rows.map(row => ({
+        row: row,
+        key: (row.cells[columnIndex].textContent || '').trim().toLowerCase()
+    }));
+    keyed.sort((a, b) => {
+        const comparison = collator.compare(a.key, b.key);
+        return direction === 'asc' ? comparison : -comparison;
+    });
 
-def write_html(users: List[Dict[str, str]], title: str, timestamp: str, filename: str) -> None:
-    """Write user data to sortable HTML file."""
-    html_template = '''<!DOCTYPE html>
+    // Re-append sorted rows in a single DOM insertion
+    const fragment = document.createDocumentFragment();
+    keyed.forEach(({ row }) => fragment.appendChild(row));
+    tbody.appendChild(fragment);
+
+    // Update header classes
+    headers.forEach(header => {
+        header.classList.remove('sorted-asc', 'sorted-desc');
+    });
+    headers[columnIndex].classList.add(`sorted-${direction}`);
+
+    // Store current sort
+    currentSort = { column: columnIndex, direction: direction };
+}
+'''
+
+
+def asset_name(stem: str, content: str, extension: str) -> str:
+    """Return a content-hashed file name for a report asset."""
+    digest = hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+    return f"{stem}.{digest}.{extension}"
+
+
+CSS_FILE = asset_name('report', REPORT_CSS, 'css')
+JS_FILE = asset_name('report', REPORT_JS, 'js')
+
+
+# Parsed once at import; substituted per report
+HTML_TEMPLATE = string.Template('''<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        * {{
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Arial, sans-serif;
-            margin: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background-color: white;
-            padding: 30px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        h2 {{
-            color: #333;
-            margin-bottom: 10px;
-        }}
-        .stats {{
-            color: #666;
-            margin-bottom: 20px;
-            font-size: 14px;
-        }}
-        table {{
-            border-collapse: collapse;
-            width: 100%;
-        }}
-        th {{
-            background-color: #90EE90;
-            padding: 12px;
-            text-align: left;
-            cursor: pointer;
-            user-select: none;
-            font-weight: 600;
-            position: relative;
-        }}
-        th:hover {{
-            background-color: #7CCD7C;
-        }}
-        th::after {{
-            content: ' ⇅';
-            font-size: 0.8em;
-            color: #666;
-            opacity: 0.5;
-        }}
-        th.sorted-asc::after {{
-            content: ' ▲';
-            opacity: 1;
-        }}
-        th.sorted-desc::after {{
-            content: ' ▼';
-            opacity: 1;
-        }}
-        td {{
-            background-color: #f9f9f9;
-            padding: 10px 12px;
-            border-bottom: 1px solid #e0e0e0;
-        }}
-        tr:hover td {{
-            background-color: #f0f0f0;
-        }}
-        tr:nth-child(even) td {{
-            background-color: #fafafa;
-        }}
-        tr:nth-child(even):hover td {{
-            background-color: #f0f0f0;
-        }}
-        .footer {{
-            margin-top: 30px;
-            padding-top: 20px;
-            border-top: 1px solid #e0e0e0;
-            color: #666;
-            font-size: 14px;
-        }}
-        @media (max-width: 768px) {{
-            body {{
-                margin: 10px;
-            }}
-            .container {{
-                padding: 15px;
-            }}
-            table {{
-                font-size: 14px;
-            }}
-        }}
-    </style>
+    <title>${title}</title>
+    <link rel="stylesheet" href="assets/${css_file}">
 </head>
 <body>
     <div class="container">
-        <h2>{title}</h2>
-        <div class="stats">Total users: {count}</div>
+        <h2>${title}</h2>
+        <div class="stats">Total users: ${count}</div>
         <table id="userTable">
             <thead>
                 <tr>
@@ -232,73 +696,53 @@ def write_html(users: List[Dict[str, str]], title: str, timestamp: str, filename
                 </tr>
             </thead>
             <tbody>
-{rows}
-            </tbody>
+${rows}            </tbody>
         </table>
         <div class="footer">
-            <p><strong>Last updated:</strong> {timestamp}</p>
-            <p><strong>Report files:</strong> saml_users_{file_timestamp}.csv / saml_users_{file_timestamp}.html</p>
+            <p><strong>Last updated:</strong> ${timestamp}</p>
+            <p><strong>Report files:</strong> ${csv_name} / ${html_name}</p>
         </div>
     </div>
     
-    <script>
-        let currentSort = {{ column: -1, direction: 'asc' }};
-        
-        function sortTable(columnIndex) {{
-            const table = document.getElementById("userTable");
-            const tbody = table.querySelector("tbody");
-            const rows = Array.from(tbody.querySelectorAll("tr"));
-            const headers = table.querySelectorAll("th");
-            
-            // Determine sort direction
-            let direction = 'asc';
-            if (currentSort.column === columnIndex && currentSort.direction === 'asc') {{
-                direction = 'desc';
-            }}
-            
-            // Sort rows
-            rows.sort((a, b) => {{
-                const aText = a.cells[columnIndex].textContent.trim().toLowerCase();
-                const bText = b.cells[columnIndex].textContent.trim().toLowerCase();
-                
-                const comparison = aText.localeCompare(bText);
-                return direction === 'asc' ? comparison : -comparison;
-            }});
-            
-            // Re-append sorted rows
-            rows.forEach(row => tbody.appendChild(row));
-            
-            // Update header classes
-            headers.forEach(header => {{
-                header.classList.remove('sorted-asc', 'sorted-desc');
-            }});
-            headers[columnIndex].classList.add(`sorted-${{direction}}`);
-            
-            // Store current sort
-            currentSort = {{ column: columnIndex, direction: direction }};
-        }}
-    </script>
+    <script src="assets/${js_file}"></script>
 </body>
 </html>
-'''
-    
-    rows_html = '\n'.join(
-        f'                <tr><td>{user["org"]}</td><td>{user["username"]}</td><td>{user["email"]}</td></tr>'
-        for user in users
-    )
-    
-    # Extract just the filename timestamp for display
-    file_timestamp = Path(filename).stem.replace('saml_users_', '')
+''')
+
+
+def write_assets(assets_dir: Path) -> None:
+    """Write the report stylesheet and script unless they already exist."""
+    assets_dir.mkdir(exist_ok=True)
+    for name, content in ((CSS_FILE, REPORT_CSS), (JS_FILE, REPORT_JS)):
+        path = assets_dir / name
+        if not path.exists():
+            path.write_text(content, encoding='utf-8')
+
+
+def write_html(csv_filename: str, count: int, title: str, timestamp: str, filename: str) -> None:
+    """Write user data from a report CSV to sortable HTML file."""
+    with open_report(csv_filename, 'r') as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader)  # Skip header
+        rows_html = ''.join([
+            '                <tr><td>%s</td><td>%s</td><td>%s</td></tr>\n'
+            % (escape(org), escape(username), escape(email))
+            for org, username, email in reader
+        ])
     
-    html_content = html_template.format(
-        title=title,
-        count=len(users),
+    html_content = HTML_TEMPLATE.substitute(
+        title=escape(title),
+        count=count,
         rows=rows_html,
         timestamp=timestamp,
-        file_timestamp=file_timestamp
+        css_file=CSS_FILE,
+        js_file=JS_FILE,
+        csv_name=Path(csv_filename).name,
+        html_name=Path(filename).name
     )
     
-    with open(filename, 'w', encoding='utf-8') as f:
+    write_assets(Path(filename).parent / 'assets')
+    with open_report(filename, 'w') as f:
         f.write(html_content)
     
     print(f"✓ HTML file created: {filename}")
@@ -306,39 +750,17 @@ def write_html(users: List[Dict[str, str]], title: str, timestamp: str, filename
 
 def main():
     """Main execution function."""
+    args = parse_args()
+    
     try:
         # Load configuration
         config = load_config()
-        token = config.get('configuration', 'github_api_token')
-        org_string = config.get('configuration', 'github_org')
-        html_header = config.get('configuration', 'HTML_HEADER')
-        
-        organizations = [org.strip() for org in org_string.split(',')]
+        organizations = config.orgs
         
         print(f"Querying {len(organizations)} organization(s)...\n")
         
-        # Collect all users
-        all_users = []
-        for org in organizations:
-            print(f"Fetching users from {org}...")
-            try:
-                response = get_saml_users(org, token)
-                users = extract_users(response, org)
-                all_users.extend(users)
-                print(f"  Found {len(users)} users")
-            except requests.RequestException as e:
-                print(f"  Error fetching data: {e}")
-            except Exception as e:
-                print(f"  Unexpected error: {e}")
-        
-        if not all_users:
-            print("\nNo users found. Please check:")
-            print("  - API token has correct permissions")
-            print("  - Organizations have SAML enabled")
-            print("  - Organization names are correct")
-            sys.exit(1)
-        
-        print(f"\n{len(all_users)} total users found\n")
+        if args.no_cache:
+            clear_cache()
         
         # Create Reports directory if it doesn't exist
         reports_dir = Path("Reports")
@@ -346,20 +768,35 @@ def main():
         print(f"✓ Reports directory ready: {reports_dir}/\n")
         
         # Generate timestamp for filenames and display
-        local_time = arrow.utcnow().to('US/Eastern')
-        timestamp_display = local_time.format('MM-DD-YYYY HH:mm:ss')
-        timestamp_file = local_time.format('YYYY-MM-DD_HHmmss')
+        local_time = datetime.now(ZoneInfo('America/New_York'))
+        timestamp_display = local_time.strftime('%m-%d-%Y %H:%M:%S')
+        timestamp_file = local_time.strftime('%Y-%m-%d_%H%M%S')
         
         # Create filenames with timestamp
-        csv_filename = reports_dir / f"saml_users_{timestamp_file}.csv"
+        # The HTML stays plain so it can be opened straight from disk
+        csv_suffix = '' if args.no_compress else '.gz'
+        csv_filename = reports_dir / f"saml_users_{timestamp_file}.csv{csv_suffix}"
         html_filename = reports_dir / f"saml_users_{timestamp_file}.html"
         
-        # Write outputs
-        write_csv(all_users, str(csv_filename))
+        # Stream users to the CSV as each organization is fetched
+        with create_session(config.token) as session:
+            user_count = write_csv(iter_report_rows(session, organizations, config.cache_ttl), str(csv_filename))
+        
+        if not user_count:
+            csv_filename.unlink()
+            print("\nNo users found. Please check:")
+            print("  - API token has correct permissions")
+            print("  - Organizations have SAML enabled")
+            print("  - Organization names are correct")
+            sys.exit(1)
+        
+        print(f"\n{user_count} total users found\n")
+        print(f"✓ CSV file created: {csv_filename} ({user_count} users)")
         
+        # Build the HTML report from the CSV in a second pass
         org_names = ', '.join(organizations)
-        title = f"{html_header} {org_names} with SSO account information"
-        write_html(all_users, title, timestamp_display, str(html_filename))
+        title = f"{config.html_header} {org_names} with SSO account information"
+        write_html(str(csv_filename), user_count, title, timestamp_display, str(html_filename))
         
         print("\n✓ All files generated successfully!")
         